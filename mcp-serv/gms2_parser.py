@@ -4,49 +4,272 @@ GameMaker Studio 2 Project Parser Module
 """
 
 import os
-import json
+import mmap
 import re
-from collections import Counter
-from typing import List, Dict, Tuple, Optional, Any
+import itertools
+import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Dict, Set, Tuple, Optional, Any
+
+from serialization import HAS_ORJSON, JSONDecodeError, dumps, loads
+
+# Optional filesystem watcher for instant scan-cache invalidation
+try:
+    from watchdog.observers import Observer
+except ImportError:
+    Observer = None
+
+_TRAILING_COMMA_RE = re.compile(rb",\s*([]}])")
+_O_NOATIME = getattr(os, 'O_NOATIME', 0)  # Linux only
+_ICO_INSERT_RE = re.compile(rb'("instanceCreationOrder":\[.*?)(\r?\n\s*\],)', re.DOTALL)
+_RESOURCES_INSERT_RE = re.compile(rb'("resources":\s*\[.*?)(\r?\n\s*\],)', re.DOTALL)
+
+
+def _parse_yy_json(content: bytes) -> Any:
+    """Parses raw .yy/.yyp bytes, tolerating the trailing commas GameMaker writes."""
+    if HAS_ORJSON:
+        # Already-valid JSON needs no repair pass
+        try:
+            return loads(content)
+        except JSONDecodeError:
+            pass
+    # Очищаем JSON от лишних запятых
+    return loads(_TRAILING_COMMA_RE.sub(rb"\1", content))
+
+
+def _dumps_yy_compact(value: Any) -> str:
+    """Serializes a value on one line the way GameMaker does: no spaces, a comma after every member."""
+    if isinstance(value, dict):
+        return "{" + "".join(f"{dumps(k)}:{_dumps_yy_compact(v)}," for k, v in value.items()) + "}"
+    if isinstance(value, list):
+        return "[" + "".join(f"{_dumps_yy_compact(v)}," for v in value) + "]"
+    return dumps(value)
+
+
+def _dumps_yy(data: Dict[str, Any], newline: str = "\n") -> str:
+    """Serializes a .yy resource in GameMaker's layout.
+
+    Top-level members go one per line; non-empty dicts and lists directly under the
+    root are expanded one member/item per line, and anything deeper stays compact.
+    """
+    lines = ["{"]
+    for key, value in data.items():
+        prefix = f"  {dumps(key)}:"
+        if isinstance(value, dict) and value:
+            lines.append(prefix + "{")
+            lines.extend(f"    {dumps(k)}:{_dumps_yy_compact(v)}," for k, v in value.items())
+            lines.append("  },")
+        elif isinstance(value, list) and value:
+            lines.append(prefix + "[")
+            lines.extend(f"    {_dumps_yy_compact(item)}," for item in value)
+            lines.append("  ],")
+        else:
+            lines.append(f"{prefix}{_dumps_yy_compact(value)},")
+    lines.append("}")
+    return newline.join(lines)
+
+
+def _instance_count_lines(instances: List[Dict[str, Any]], prefix_connector: str) -> List[str]:
+    """Builds the sorted "name (xN)" tree lines for a room layer's instances."""
+    # Counter's constructor counts in C, unlike a Python-level += loop
+    counts = Counter(inst.get('objId', {}).get('name', 'UnknownObject') for inst in instances)
+    sorted_objects = sorted(counts.items())
+    last = len(sorted_objects) - 1
+    return [
+        f"{prefix_connector}{'└──' if j == last else '├──'} {obj_name}"
+        f"{f' (x{count})' if count > 1 else ''}"
+        for j, (obj_name, count) in enumerate(sorted_objects)
+    ]
+
+
+def _gml_details_order(details: Tuple[str, str, str, Optional[str]]) -> Tuple[str, str]:
+    """Sort key for project_gml_files_details: display name, then relative path."""
+    return details[0], details[2]
+
+
+def _open_for_read(path: str) -> int:
+    """Opens a file read-only at the fd level, skipping atime updates where allowed."""
+    flags = os.O_RDONLY | getattr(os, 'O_BINARY', 0)
+    if _O_NOATIME:
+        try:
+            return os.open(path, flags | _O_NOATIME)
+        except PermissionError:
+            # O_NOATIME is only permitted for the file owner
+            pass
+    return os.open(path, flags)
+
+
+def _read_text(path: str, size: Optional[int] = None) -> Tuple[Optional[str], Optional[Exception]]:
+    """Reads a UTF-8 file for the export prefetcher, capturing the error instead of raising.
+
+    The file is read with raw fd reads sized from the directory scan (or fstat),
+    and newlines are translated as text mode would.
+    """
+    try:
+        fd = _open_for_read(path)
+        try:
+            if size is None:
+                size = os.fstat(fd).st_size
+            # One extra byte tells whether the file grew since it was sized
+            data = os.read(fd, size + 1)
+            if len(data) > size:
+                chunks = [data]
+                while chunk := os.read(fd, 1 << 16):
+                    chunks.append(chunk)
+                data = b"".join(chunks)
+        finally:
+            os.close(fd)
+
+        text = data.decode('utf-8')
+        if '\r' in text:
+            text = text.replace('\r\n', '\n').replace('\r', '\n')
+        return text, None
+    except Exception as e:
+        return None, e
+
+
+class _ProjectChangeHandler:
+    """watchdog event handler that marks the parser's scan cache dirty."""
+
+    _WATCHED_EXTENSIONS = ('.gml', '.yy', '.yyp')
+    _WATCHED_EVENTS = frozenset({'created', 'deleted', 'moved', 'modified'})
+
+    def __init__(self, parser: "GMS2ProjectParser"):
+        self._parser = parser
+
+    def dispatch(self, event):
+        if event.event_type not in self._WATCHED_EVENTS:
+            return
+        # Folder adds/removes change the asset list; folder "modified" is just noise
+        if event.is_directory:
+            if event.event_type != 'modified':
+                self._parser._cache_dirty = True
+            return
+        paths = (event.src_path, getattr(event, 'dest_path', '') or '')
+        if any(str(path).endswith(self._WATCHED_EXTENSIONS) for path in paths):
+            self._parser._cache_dirty = True
 
 
 class GMS2ProjectParser:
     """Parser for GameMaker Studio 2 projects"""
 
-    def __init__(self, project_path: str):
+    # DirEntry.stat() is served from the FindFirstFile data on Windows, a syscall elsewhere
+    _STAT_IS_FREE = os.name == 'nt'
+    # DirEntry.inode() comes from readdir on POSIX; on Windows the first call is a syscall
+    _INODE_IS_FREE = os.name != 'nt'
+
+    # Export reads queued ahead of the output; sized for the many small GML files
+    _EXPORT_READ_WINDOW = 512
+
+    # Top-level project folders that never contain asset GML
+    _SKIPPED_DIRS = frozenset({'options', 'datafiles', 'configs', '.git', '.vscode', 'temp'})
+
+    # Категории ассетов
+    _ASSET_CATEGORIES = {
+        "Objects": "objects",
+        "Scripts": "scripts",
+        "Rooms": "rooms",
+        "Sprites": "sprites",
+        "Notes": "notes",
+        "Tile Sets": "tilesets",
+        "Timelines": "timelines",
+        "Fonts": "fonts",
+        "Sounds": "sounds",
+        "Extensions": "extensions"
+    }
+
+    def __init__(self, project_path: str, cache_ttl: float = 5.0, watch: bool = False,
+                 max_workers: Optional[int] = None):
         self.project_path = project_path
+        # Reads are I/O-bound and release the GIL, so oversubscribe the CPU count; 1 reads inline
+        self.max_workers = max_workers if max_workers is not None else min(32, (os.cpu_count() or 1) * 4)
+        self._abs_project = os.path.realpath(project_path)
         self.project_gml_files_details = []  # (display_name, gml_path, relative_path, asset_yy_path)
+        self._file_sizes = {}  # path -> size, when known from the directory listing
+        self.cache_ttl = cache_ttl
+        self._scan_cache = {"structure": None, "mtime": None, "ts": 0}
+        self._yyp_cache = {"path": None, "mtime": None, "data": None, "pending": []}
+        self._yy_cache = {}  # .yy path -> ((st_mtime_ns, st_size), parsed data)
 
-    @staticmethod
-    def _normalize_path(path: str) -> str:
-        """Normalize path separators to forward slashes for consistent output."""
-        return path.replace('\\', '/')
+        # With a live watcher the scan cache stays valid until a change event arrives.
+        # The watcher starts on the first scan_project that finds a .yyp, so arbitrary
+        # folders never get a recursive observer
+        self._cache_dirty = True
+        self._observer = None
+        self._watch = watch
+
+    def start_watching(self) -> bool:
+        """Starts a watchdog observer on the project.
+
+        Returns False if watchdog is unavailable or the observer can't start (e.g. the
+        inotify watch limit is reached); the TTL/mtime check then keeps the cache fresh.
+        """
+        if self._observer is not None:
+            return True
+        if Observer is None or not os.path.isdir(self.project_path):
+            return False
+        observer = Observer()
+        try:
+            observer.schedule(_ProjectChangeHandler(self), self.project_path, recursive=True)
+            observer.daemon = True
+            observer.start()
+        except OSError:
+            observer.unschedule_all()
+            return False
+        self._observer = observer
+        return True
+
+    def stop_watching(self):
+        """Stops the watchdog observer for good, falling back to TTL/mtime cache validation."""
+        # Without this a later scan_project would start a new observer
+        self._watch = False
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+            self._observer = None
+        self._cache_dirty = True
+
+    def _is_inside_project(self, real_path: str) -> bool:
+        """Checks that an already-resolved path lies within the resolved project root."""
+        try:
+            return os.path.commonpath([real_path, self._abs_project]) == self._abs_project
+        except ValueError:
+            # Different drives on Windows
+            return False
+
+    # Chosen once at import time: POSIX paths already use forward slashes
+    if os.sep == '\\':
+        @staticmethod
+        def _normalize_path(path: str) -> str:
+            """Normalize path separators to forward slashes for consistent output."""
+            return path.replace('\\', '/')
+    else:
+        @staticmethod
+        def _normalize_path(path: str) -> str:
+            """Normalize path separators to forward slashes for consistent output."""
+            return path
         
     def scan_project(self) -> Dict[str, Any]:
         """Сканирует проект и возвращает структуру файлов"""
         if not os.path.exists(self.project_path):
             return {"error": f"Project path not found: {self.project_path}"}
-            
+
+        # Повторный вызов на неизменённом проекте отдаёт кэш
+        cached, signature = self._cached_structure()
+        if cached is not None:
+            return cached
+
         # Проверяем наличие .yyp файла
         yyp_files = [f for f in os.listdir(self.project_path) if f.endswith('.yyp')]
         if not yyp_files:
             return {"error": f"No .yyp file found in {self.project_path}"}
             
-        self.project_gml_files_details.clear()
-        
-        # Категории ассетов
-        asset_categories = {
-            "Objects": "objects",
-            "Scripts": "scripts", 
-            "Rooms": "rooms",
-            "Sprites": "sprites",
-            "Notes": "notes",
-            "Tile Sets": "tilesets",
-            "Timelines": "timelines",
-            "Fonts": "fonts",
-            "Sounds": "sounds",
-            "Extensions": "extensions"
-        }
+        if self._watch and self._observer is None:
+            self._watch = self.start_watching()
+
+        # Changes that land while scanning must re-dirty the fresh result
+        self._cache_dirty = False
         
         structure = {
             "project_name": os.path.basename(self.project_path),
@@ -57,7 +280,7 @@ class GMS2ProjectParser:
         }
         
         # Сканируем каждую категорию
-        for display_name, folder_name in asset_categories.items():
+        for display_name, folder_name in self._ASSET_CATEGORIES.items():
             category_path = os.path.join(self.project_path, folder_name)
             if os.path.isdir(category_path):
                 structure["categories"][display_name] = self._scan_category(category_path, display_name)
@@ -66,8 +289,69 @@ class GMS2ProjectParser:
         self._scan_gml_files()
         structure["gml_files"] = self.project_gml_files_details
         structure["total_gml_files"] = len(self.project_gml_files_details)
-        
+
+        self._scan_cache = {"structure": structure, "mtime": signature, "ts": time.monotonic()}
+        return structure
+
+    def scan_category(self, category_name: str) -> Dict[str, Any]:
+        """Scans a single asset category; same shape as scan_project, minus the GML file list."""
+        if not os.path.exists(self.project_path):
+            return {"error": f"Project path not found: {self.project_path}"}
+
+        folder_name = self._ASSET_CATEGORIES.get(category_name)
+        if folder_name is None:
+            return {"error": f"Unknown category: {category_name}"}
+
+        structure = {
+            "project_name": os.path.basename(self.project_path),
+            "project_path": self.project_path,
+            "categories": {},
+        }
+
+        # A still-valid full scan already holds the category
+        cached, _ = self._cached_structure()
+        if cached is not None:
+            if category_name in cached["categories"]:
+                structure["categories"][category_name] = cached["categories"][category_name]
+            return structure
+
+        if not any(f.endswith('.yyp') for f in os.listdir(self.project_path)):
+            return {"error": f"No .yyp file found in {self.project_path}"}
+
+        category_path = os.path.join(self.project_path, folder_name)
+        if os.path.isdir(category_path):
+            structure["categories"][category_name] = self._scan_category(category_path, category_name)
         return structure
+
+    def _cached_structure(self) -> Tuple[Optional[Dict[str, Any]], Optional[Tuple[Optional[int], ...]]]:
+        """Returns (cached scan_project result or None, scan signature if one was computed)."""
+        cache = self._scan_cache
+        if self._observer is not None:
+            # The watcher sees edits inside asset folders that leave the signature
+            # unchanged, so while it runs its dirty flag alone decides
+            if not self._cache_dirty and cache["structure"] is not None:
+                return cache["structure"], None
+            return None, self._scan_signature()
+        signature = self._scan_signature()
+        if (cache["structure"] is not None and cache["mtime"] == signature
+                and time.monotonic() - cache["ts"] < self.cache_ttl):
+            return cache["structure"], signature
+        return None, signature
+
+    def _scan_signature(self) -> Tuple[Optional[int], ...]:
+        """Cheap change token: mtimes of the project root and its category folders."""
+        mtimes = [os.stat(self.project_path).st_mtime_ns]
+        for folder_name in self._ASSET_CATEGORIES.values():
+            try:
+                mtimes.append(os.stat(os.path.join(self.project_path, folder_name)).st_mtime_ns)
+            except OSError:
+                mtimes.append(None)
+        return tuple(mtimes)
+
+    def clear_cache(self):
+        """Drops the cached scan_project result."""
+        self._scan_cache = {"structure": None, "mtime": None, "ts": 0}
+        self._cache_dirty = True
     
     def _scan_category(self, category_path: str, category_name: str) -> Dict[str, Any]:
         """Сканирует категорию ассетов"""
@@ -77,71 +361,117 @@ class GMS2ProjectParser:
         }
         
         try:
-            for asset_name in sorted(os.listdir(category_path)):
-                asset_path = os.path.join(category_path, asset_name)
-                if os.path.isdir(asset_path):
-                    asset_info = {
-                        "name": asset_name,
-                        "path": asset_path,
-                        "type": category_name.lower().rstrip('s'),  # objects -> object
-                        "yy_file": None,
-                        "gml_files": []
-                    }
-                    
-                    # Ищем .yy файл
-                    yy_path = os.path.join(asset_path, f"{asset_name}.yy")
-                    if os.path.isfile(yy_path):
-                        asset_info["yy_file"] = yy_path
-                        
-                    # Ищем .gml файлы
-                    for file in os.listdir(asset_path):
-                        if file.endswith('.gml'):
-                            gml_path = os.path.join(asset_path, file)
+            with os.scandir(category_path) as it:
+                asset_entries = [entry for entry in it if entry.is_dir(follow_symlinks=False)]
+            # Where inode numbers are free, visit asset folders in inode order so the
+            # follow-up metadata reads stay sequential on disk; output is sorted by name below
+            if self._INODE_IS_FREE:
+                asset_entries.sort(key=lambda entry: entry.inode())
+
+            for entry in asset_entries:
+                asset_info = {
+                    "name": entry.name,
+                    "path": entry.path,
+                    "type": category_name.lower().rstrip('s'),  # objects -> object
+                    "yy_file": None,
+                    "gml_files": []
+                }
+
+                # Ищем .yy и .gml файлы за один проход по папке ассета
+                yy_name = f"{entry.name}.yy"
+                with os.scandir(entry.path) as sub_it:
+                    for sub in sub_it:
+                        if not sub.is_file():
+                            continue
+                        if sub.name == yy_name:
+                            asset_info["yy_file"] = sub.path
+                        elif sub.name.endswith('.gml'):
                             asset_info["gml_files"].append({
-                                "name": file,
-                                "path": gml_path
+                                "name": sub.name,
+                                "path": sub.path
                             })
-                            
-                    category_info["assets"].append(asset_info)
-                    
+
+                category_info["assets"].append(asset_info)
+
         except OSError as e:
             category_info["error"] = f"Could not read directory: {e}"
-            
+
+        category_info["assets"].sort(key=lambda asset: asset["name"])
         return category_info
     
     def _scan_gml_files(self):
         """Сканирует все GML файлы в проекте"""
-        for root, dirs, files in os.walk(self.project_path):
-            # Пропускаем системные папки
-            relative_root = os.path.relpath(root, self.project_path)
-            if relative_root != '.':
-                top_dir = relative_root.split(os.sep)[0].lower()
-                if top_dir in ['options', 'datafiles', 'configs', '.git', '.vscode', 'temp']:
-                    dirs[:] = []
-                    continue
-                    
-            for file in sorted(files):
-                if file.endswith('.gml'):
-                    file_path = os.path.join(root, file)
-                    relative_path = os.path.relpath(file_path, self.project_path)
-                    parent_dir = os.path.dirname(file_path)
-                    
-                    # Определяем связанный .yy файл
-                    asset_yy_path = None
-                    asset_name = os.path.basename(parent_dir)
-                    potential_yy_path = os.path.join(parent_dir, f"{asset_name}.yy")
-                    if os.path.isfile(potential_yy_path):
-                        asset_yy_path = potential_yy_path
-                        
-                    # Определяем display name
-                    parent_asset_name = os.path.basename(parent_dir)
-                    gml_name = os.path.splitext(file)[0]
-                    display_name = f"{parent_asset_name} / {gml_name}"
-                    
-                    self.project_gml_files_details.append((
-                        display_name, file_path, self._normalize_path(relative_path), asset_yy_path
-                    ))
-    
+        self._file_sizes.clear()
+        details = []
+
+        for dir_path, gml_names, names_here, file_sizes in self._walk_project(self.project_path):
+            # Определяем связанный .yy файл по именам из того же прохода по папке
+            asset_name = os.path.basename(dir_path)
+            yy_name = f"{asset_name}.yy"
+            asset_yy_path = None
+            if yy_name in names_here:
+                asset_yy_path = os.path.join(dir_path, yy_name)
+                if yy_name in file_sizes:
+                    self._file_sizes[asset_yy_path] = file_sizes[yy_name]
+
+            for gml_file in gml_names:
+                file_path = os.path.join(dir_path, gml_file)
+                if gml_file in file_sizes:
+                    self._file_sizes[file_path] = file_sizes[gml_file]
+                relative_path = os.path.relpath(file_path, self.project_path)
+
+                # Определяем display name
+                gml_name = os.path.splitext(gml_file)[0]
+                display_name = f"{asset_name} / {gml_name}"
+
+                details.append((
+                    display_name, file_path, self._normalize_path(relative_path), asset_yy_path
+                ))
+
+        # Directories are visited in on-disk order, so sort once for a deterministic list
+        details.sort(key=_gml_details_order)
+        # A fresh list, never refilled in place: results handed out by earlier scans
+        # stay intact while another thread rescans
+        self.project_gml_files_details = details
+
+    def _walk_project(self, root: str) -> Iterator[Tuple[str, List[str], Set[str], Dict[str, int]]]:
+        """Walks the project tree top-down, yielding (dir_path, gml_names, names_here, file_sizes).
+
+        names_here holds the names of all files in the directory, collected during
+        the same listing pass, so sibling lookups (e.g. the asset .yy) need no stat.
+        file_sizes maps file names to sizes where the listing provides them for free
+        (Windows), and is empty otherwise. System folders directly under the project
+        root are pruned.
+        """
+        stack = [(root, 0)]
+        while stack:
+            dir_path, depth = stack.pop()
+            gml_names = []
+            subdirs = []
+            names_here = set()
+            file_sizes = {}
+
+            try:
+                with os.scandir(dir_path) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            if depth == 0 and entry.name.lower() in self._SKIPPED_DIRS:
+                                continue
+                            subdirs.append(entry)
+                        elif entry.is_file(follow_symlinks=False):
+                            names_here.add(entry.name)
+                            if self._STAT_IS_FREE:
+                                file_sizes[entry.name] = entry.stat(follow_symlinks=False).st_size
+                            if entry.name.endswith('.gml'):
+                                gml_names.append(entry.name)
+            except OSError:
+                continue
+
+            yield dir_path, gml_names, names_here, file_sizes
+
+            # Visit order doesn't matter: _scan_gml_files sorts the collected files
+            stack.extend((entry.path, depth + 1) for entry in subdirs)
+
     def get_gml_content(self, file_path: str) -> Dict[str, Any]:
         """Получает содержимое GML файла"""
         try:
@@ -169,12 +499,7 @@ class GMS2ProjectParser:
             return {"error": f"Room .yy file not found: {room_yy_path}"}
             
         try:
-            with open(room_yy_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-                
-            # Очищаем JSON от лишних запятых
-            content_cleaned = re.sub(r",\s*([]}])", r"\1", content)
-            room_data = json.loads(content_cleaned)
+            room_data = self._load_yy(room_yy_path)
             
             return {
                 "room_name": room_name,
@@ -183,7 +508,7 @@ class GMS2ProjectParser:
                 "data": room_data,
                 "formatted_info": self._format_room_data(room_data)
             }
-        except json.JSONDecodeError as e:
+        except JSONDecodeError as e:
             return {"error": f"Error parsing room JSON: {e}"}
         except Exception as e:
             return {"error": f"Error reading room file: {e}"}
@@ -197,12 +522,7 @@ class GMS2ProjectParser:
             return {"error": f"Object .yy file not found: {object_yy_path}"}
             
         try:
-            with open(object_yy_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-                
-            # Очищаем JSON от лишних запятых
-            content_cleaned = re.sub(r",\s*([]}])", r"\1", content)
-            object_data = json.loads(content_cleaned)
+            object_data = self._load_yy(object_yy_path)
             
             return {
                 "object_name": object_name,
@@ -211,7 +531,7 @@ class GMS2ProjectParser:
                 "data": object_data,
                 "formatted_info": self._format_object_data(object_data)
             }
-        except json.JSONDecodeError as e:
+        except JSONDecodeError as e:
             return {"error": f"Error parsing object JSON: {e}"}
         except Exception as e:
             return {"error": f"Error reading object file: {e}"}
@@ -233,20 +553,29 @@ class GMS2ProjectParser:
         
         # Ищем PNG файлы (кадры спрайта)
         try:
-            for filename in sorted(os.listdir(sprite_path)):
-                if filename.lower().endswith('.png'):
-                    sprite_info["frames"].append({
-                        "filename": filename,
-                        "path": os.path.join(sprite_path, filename)
-                    })
+            with os.scandir(sprite_path) as it:
+                frame_entries = sorted(
+                    (entry for entry in it
+                     if entry.name.lower().endswith('.png') and entry.is_file()),
+                    key=lambda entry: entry.name,
+                )
+            for entry in frame_entries:
+                sprite_info["frames"].append({
+                    "filename": entry.name,
+                    "path": entry.path
+                })
         except OSError as e:
             sprite_info["error"] = f"Error reading sprite folder: {e}"
             
         return sprite_info
     
     def duplicate_object(self, source_name: str, new_name: str,
-                         property_overrides: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
-        """Duplicates a GMS2 object with a new name and optional property changes."""
+                         property_overrides: Optional[Dict[str, str]] = None,
+                         flush: bool = True) -> Dict[str, Any]:
+        """Duplicates a GMS2 object with a new name and optional property changes.
+
+        Pass flush=False when duplicating in bulk and call flush_yyp() once afterwards.
+        """
         source_path = os.path.join(self.project_path, "objects", source_name)
         new_path = os.path.join(self.project_path, "objects", new_name)
 
@@ -263,41 +592,48 @@ class GMS2ProjectParser:
             new_yy = os.path.join(new_path, f"{new_name}.yy")
 
             if os.path.isfile(source_yy):
-                with open(source_yy, 'r', encoding='utf-8') as f:
-                    yy_content = f.read()
+                # Parsed fresh rather than via _load_yy: this copy is mutated below
+                with open(source_yy, 'rb') as f:
+                    source_bytes = f.read()
+                yy_data = _parse_yy_json(source_bytes)
 
                 # Replace this object's name references (other object refs stay intact)
-                yy_content = yy_content.replace(f'"{source_name}"', f'"{new_name}"')
-                yy_content = yy_content.replace(
-                    f'{source_name}/{source_name}.yy',
-                    f'{new_name}/{new_name}.yy',
-                )
+                self._rename_object_refs(yy_data, source_name, new_name)
 
-                # Apply property value overrides
+                # Apply property value overrides in a single pass over the variables
                 if property_overrides:
-                    for prop_name, new_value in property_overrides.items():
-                        # Each property is on one line with "name" and "value" fields
-                        pattern = (
-                            rf'("name":"{re.escape(prop_name)}"'
-                            rf'.*?"value":)"([^"]*)"'
-                        )
-                        yy_content = re.sub(pattern, rf'\1"{new_value}"', yy_content)
+                    for prop in yy_data.get("properties", []):
+                        if prop.get("name") in property_overrides:
+                            prop["value"] = property_overrides[prop["name"]]
 
-                with open(new_yy, 'w', encoding='utf-8') as f:
-                    f.write(yy_content)
+                # Written in GameMaker's own layout, keeping the source's line endings
+                newline = "\r\n" if b"\r\n" in source_bytes else "\n"
+                yy_text = _dumps_yy(yy_data, newline)
+                if source_bytes.endswith(b"\n"):
+                    yy_text += newline
+                with open(new_yy, 'wb') as f:
+                    f.write(yy_text.encode('utf-8'))
+                self._yy_cache.pop(new_yy, None)
 
             # Copy all .gml event files
             copied_gml = []
-            for filename in sorted(os.listdir(source_path)):
-                if filename.endswith('.gml'):
-                    with open(os.path.join(source_path, filename), 'r', encoding='utf-8') as f:
-                        content = f.read()
-                    with open(os.path.join(new_path, filename), 'w', encoding='utf-8') as f:
-                        f.write(content)
-                    copied_gml.append(filename)
+            with os.scandir(source_path) as it:
+                gml_entries = sorted(
+                    (entry for entry in it if entry.name.endswith('.gml') and entry.is_file()),
+                    key=lambda entry: entry.name,
+                )
+            for entry in gml_entries:
+                with open(entry.path, 'r', encoding='utf-8') as f:
+                    content = f.read()
+                with open(os.path.join(new_path, entry.name), 'w', encoding='utf-8') as f:
+                    f.write(content)
+                copied_gml.append(entry.name)
 
             # Register in the .yyp project file
             registered = self._register_resource_in_yyp(new_name, "objects")
+            if flush:
+                self.flush_yyp()
+            self.clear_cache()
 
             return {
                 "source": source_name,
@@ -309,38 +645,129 @@ class GMS2ProjectParser:
                 "property_overrides": property_overrides or {},
             }
         except Exception as e:
-            # Clean up partial creation on failure
+            # Clean up partial creation on failure, including its unflushed .yyp entry
             import shutil
             if os.path.isdir(new_path):
                 shutil.rmtree(new_path)
+            self._discard_pending_resource(f"objects/{new_name}/{new_name}.yy")
             return {"error": f"Failed to duplicate object: {e}"}
 
-    def _register_resource_in_yyp(self, asset_name: str, category: str) -> bool:
-        """Adds a resource entry to the .yyp project file."""
+    @classmethod
+    def _rename_object_refs(cls, data: Any, source_name: str, new_name: str):
+        """Renames the object itself and every resource reference pointing at it, in place."""
+        source_ref = f"objects/{source_name}/{source_name}.yy"
+        if isinstance(data, dict):
+            if data.get("path") == source_ref:
+                data["path"] = f"objects/{new_name}/{new_name}.yy"
+            for key in ("name", "%Name"):
+                if data.get(key) == source_name:
+                    data[key] = new_name
+            for value in data.values():
+                cls._rename_object_refs(value, source_name, new_name)
+        elif isinstance(data, list):
+            for item in data:
+                cls._rename_object_refs(item, source_name, new_name)
+
+    def _load_yy(self, yy_path: str) -> Any:
+        """Returns the parsed .yy file, re-parsing it only when its mtime or size changed.
+
+        The cached object is shared between calls, so callers must not mutate it.
+        """
+        st = os.stat(yy_path)
+        version = (st.st_mtime_ns, st.st_size)
+        hit = self._yy_cache.get(yy_path)
+        if hit is not None and hit[0] == version:
+            return hit[1]
+
+        with open(yy_path, 'rb') as f:
+            data = _parse_yy_json(f.read())
+        self._yy_cache[yy_path] = (version, data)
+        return data
+
+    def _load_yyp(self) -> Optional[Dict[str, Any]]:
+        """Returns the parsed .yyp, re-reading it only when its mtime changed."""
         yyp_files = [f for f in os.listdir(self.project_path) if f.endswith('.yyp')]
         if not yyp_files:
-            return False
+            return None
 
         yyp_path = os.path.join(self.project_path, yyp_files[0])
-        with open(yyp_path, 'r', encoding='utf-8') as f:
+        mtime = os.stat(yyp_path).st_mtime_ns
+        cache = self._yyp_cache
+        # Unflushed in-memory edits win over the file on disk
+        if cache["data"] is None or cache["path"] != yyp_path or (
+                not cache["pending"] and cache["mtime"] != mtime):
+            with open(yyp_path, 'rb') as f:
+                data = _parse_yy_json(f.read())
+            self._yyp_cache = {"path": yyp_path, "mtime": mtime, "data": data, "pending": []}
+        return self._yyp_cache["data"]
+
+    def _register_resource_in_yyp(self, asset_name: str, category: str) -> bool:
+        """Adds a resource entry to the in-memory .yyp; call flush_yyp() to persist it."""
+        yyp_data = self._load_yyp()
+        if yyp_data is None or not isinstance(yyp_data.get("resources"), list):
+            return False
+
+        resource_path = f"{category}/{asset_name}/{asset_name}.yy"
+        resources = yyp_data["resources"]
+        if not any(res.get("id", {}).get("path") == resource_path for res in resources):
+            resources.append({"id": {"name": asset_name, "path": resource_path}})
+            self._yyp_cache["pending"].append((asset_name, resource_path))
+        return True
+
+    def _discard_pending_resource(self, resource_path: str):
+        """Drops an unflushed resource entry, e.g. after the asset it names was rolled back."""
+        cache = self._yyp_cache
+        if not any(path == resource_path for _, path in cache["pending"]):
+            return
+        cache["pending"] = [entry for entry in cache["pending"] if entry[1] != resource_path]
+        cache["data"]["resources"] = [
+            res for res in cache["data"]["resources"]
+            if res.get("id", {}).get("path") != resource_path
+        ]
+
+    def flush_yyp(self) -> bool:
+        """Atomically writes pending .yyp entries to disk. Returns True if a write happened.
+
+        Only the new resource lines are spliced in before the resources array closes;
+        the rest of the file is written back byte for byte.
+        """
+        cache = self._yyp_cache
+        if not cache["pending"]:
+            return False
+
+        yyp_path = cache["path"]
+        with open(yyp_path, 'rb') as f:
             content = f.read()
 
-        new_entry = (
-            f'    {{"id":{{"name":"{asset_name}",'
-            f'"path":"{category}/{asset_name}/{asset_name}.yy",}},}},'
+        newline = b"\r\n" if b"\r\n" in content else b"\n"
+        insert = b"".join(
+            newline + f'    {{"id":{{"name":{dumps(name)},"path":{dumps(path)},}},}},'.encode('utf-8')
+            for name, path in cache["pending"]
+            # Skip entries that reached the file some other way since they were queued
+            if not re.search(rb'"path":\s*' + re.escape(dumps(path).encode('utf-8')), content)
         )
 
-        # Insert before the closing of the resources array
-        match = re.search(r'("resources":\[.*?)(\n\s*\],)', content, re.DOTALL)
-        if not match:
-            return False
+        wrote = False
+        if insert:
+            match = _RESOURCES_INSERT_RE.search(content)
+            if not match:
+                raise ValueError(f"resources array not found in {os.path.basename(yyp_path)}")
+            pos = match.end(1)
 
-        insert_pos = match.end(1)
-        content = content[:insert_pos] + '\n' + new_entry + content[insert_pos:]
+            tmp_path = yyp_path + ".tmp"
+            try:
+                with open(tmp_path, 'wb') as f:
+                    f.write(b"".join((content[:pos], insert, content[pos:])))
+                os.replace(tmp_path, yyp_path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            wrote = True
 
-        with open(yyp_path, 'w', encoding='utf-8') as f:
-            f.write(content)
-        return True
+        cache["mtime"] = os.stat(yyp_path).st_mtime_ns
+        cache["pending"] = []
+        return wrote
 
     def add_room_instance(self, room_name: str, object_name: str,
                           x: float, y: float,
@@ -389,29 +816,43 @@ class GMS2ProjectParser:
             f'"x":{x},"y":{y},}}'
         )
 
+        # The instances array closes with: ],"layers":[],"name":"{layer_name}"
+        layer_close_re = re.compile(
+            rb'(\r?\n\s*)\],"layers":\[\],"name":"' + re.escape(layer_name.encode('utf-8')) + b'"'
+        )
+        ico_entry = f'    {{"name":"{inst_id}","path":"rooms/{room_name}/{room_name}.yy",}},'
+
         try:
-            with open(room_yy, 'r', encoding='utf-8') as f:
-                content = f.read()
+            with open(room_yy, 'r+b') as f:
+                # Locate both insertion points without decoding or copying the file
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    newline = b"\r\n" if mm.find(b"\r\n") != -1 else b"\n"
 
-            # Insert instance into the target layer's instances array.
-            # The array closes with: ],"layers":[],"name":"{layer_name}"
-            layer_close = rf'(\n\s*)\],"layers":\[\],"name":"{re.escape(layer_name)}"'
-            match = re.search(layer_close, content)
-            if not match:
-                return {"error": f"Layer '{layer_name}' not found in room '{room_name}'"}
+                    match = layer_close_re.search(mm)
+                    if not match:
+                        return {"error": f"Layer '{layer_name}' not found in room '{room_name}'"}
+                    inserts = [(match.start(), newline + f"        {instance_line},".encode('utf-8'))]
+
+                    ico_match = _ICO_INSERT_RE.search(mm)
+                    if ico_match:
+                        inserts.append((ico_match.end(1), newline + ico_entry.encode('utf-8')))
 
-            insert_pos = match.start()
-            content = content[:insert_pos] + f"\n        {instance_line}," + content[insert_pos:]
+                    inserts.sort()
+                    start = inserts[0][0]
+                    tail = mm[start:]
 
-            # Insert into instanceCreationOrder
-            ico_entry = f'    {{"name":"{inst_id}","path":"rooms/{room_name}/{room_name}.yy",}},'
-            ico_match = re.search(r'("instanceCreationOrder":\[.*?)(\n\s*\],)', content, re.DOTALL)
-            if ico_match:
-                pos = ico_match.end(1)
-                content = content[:pos] + '\n' + ico_entry + content[pos:]
+                # Rewrite only the bytes from the first insertion point onwards
+                pieces = []
+                prev = start
+                for pos, data in inserts:
+                    pieces.append(tail[prev - start:pos - start])
+                    pieces.append(data)
+                    prev = pos
+                pieces.append(tail[prev - start:])
 
-            with open(room_yy, 'w', encoding='utf-8') as f:
-                f.write(content)
+                f.seek(start)
+                f.write(b"".join(pieces))
+            self._yy_cache.pop(room_yy, None)
 
             return {
                 "instance_id": inst_id,
@@ -432,10 +873,8 @@ class GMS2ProjectParser:
         if not os.path.isabs(file_path):
             file_path = os.path.join(self.project_path, file_path)
 
-        # Safety: ensure the target is inside the project directory
-        abs_project = os.path.abspath(self.project_path)
-        abs_file = os.path.abspath(file_path)
-        if not abs_file.startswith(abs_project + os.sep) and abs_file != abs_project:
+        # Safety: ensure the target is inside the project directory (symlinks resolved)
+        if not self._is_inside_project(os.path.realpath(file_path)):
             return {"error": f"Cannot write outside project directory: {file_path}"}
 
         if not file_path.endswith('.gml'):
@@ -443,8 +882,21 @@ class GMS2ProjectParser:
 
         try:
             os.makedirs(os.path.dirname(file_path), exist_ok=True)
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(content)
+
+            # Encoded once and written in binary mode, so newlines are stored exactly as given;
+            # the temp file + os.replace means readers never see a half-written file
+            data = content.encode('utf-8')
+            tmp_path = file_path + ".tmp"
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0), 0o666)
+            try:
+                with open(fd, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_path, file_path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            self.clear_cache()
 
             return {
                 "file_path": file_path,
@@ -457,58 +909,106 @@ class GMS2ProjectParser:
 
     def export_all_data(self) -> str:
         """Экспортирует все данные проекта в текстовый формат"""
-        if not self.project_gml_files_details:
-            self.scan_project()
-            
-        output_lines = []
-        output_lines.append(f"// GML and YY Data Export from Project: {self.project_path}")
-        output_lines.append(f"// Total GML Files Found: {len(self.project_gml_files_details)}")
-        output_lines.append("=" * 70)
-        output_lines.append("")
-        
+        return "".join(self.iter_export())
+
+    def export_all_data_to(self, fp) -> int:
+        """Streams the export into a writable text file object, returns characters written."""
+        written = 0
+        for chunk in self.iter_export():
+            fp.write(chunk)
+            written += len(chunk)
+        return written
+
+    def iter_export(self) -> Iterator[str]:
+        """Yields the export_all_data text in chunks without materializing it."""
+        # Served from the scan cache when nothing changed, so long-lived parsers stay fresh
+        self.scan_project()
+
+        yield (
+            f"// GML and YY Data Export from Project: {self.project_path}\n"
+            f"// Total GML Files Found: {len(self.project_gml_files_details)}\n"
+            + "=" * 70 + "\n"
+        )
+
+        # Resolve the export order up front so file reads can be prefetched. Planning does
+        # no I/O: whether a .yy still exists is learned from its read on the pool
+        plan = []  # (display_name, relative_path, yy_path or None)
+        read_paths = []
         exported_yy_files = set()
-        
         for display_name, file_path, relative_path, asset_yy_path in self.project_gml_files_details:
+            read_paths.append(file_path)
+            yy_path = None
+            if asset_yy_path and asset_yy_path not in exported_yy_files:
+                yy_path = asset_yy_path
+                read_paths.append(yy_path)
+                exported_yy_files.add(yy_path)
+            plan.append((display_name, relative_path, yy_path))
+
+        reads = self._prefetch_files(read_paths)
+
+        # Each block opens with the blank line that separates it from the previous one
+        for display_name, relative_path, yy_path in plan:
             # Экспортируем GML файл
-            output_lines.append(f"// ----- Start GML: {display_name} -----")
-            output_lines.append(f"// ----- GML Path: {relative_path} -----")
-            output_lines.append("")
-            
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    output_lines.append(f.read())
-            except Exception as e:
-                output_lines.append(f"// ***** ERROR READING GML FILE: {relative_path} *****")
-                output_lines.append(f"// ***** Error: {e} *****")
-                
-            output_lines.append("")
-            output_lines.append("-" * 50 + "[End GML]" + "-" * 19)
-            output_lines.append("")
-            
+            yield (
+                f"\n// ----- Start GML: {display_name} -----\n"
+                f"// ----- GML Path: {relative_path} -----\n\n"
+            )
+            yield self._read_result_text(next(reads), "GML", relative_path)
+            yield "\n\n" + "-" * 50 + "[End GML]" + "-" * 19 + "\n"
+
             # Экспортируем связанный YY файл
-            if asset_yy_path and os.path.isfile(asset_yy_path) and asset_yy_path not in exported_yy_files:
-                relative_yy_path = self._normalize_path(os.path.relpath(asset_yy_path, self.project_path))
-                asset_name = os.path.basename(os.path.dirname(asset_yy_path))
-                
-                output_lines.append(f"// ----- Associated YY File: {asset_name} -----")
-                output_lines.append(f"// ----- YY Path: {relative_yy_path} -----")
-                output_lines.append("")
-                
-                try:
-                    with open(asset_yy_path, 'r', encoding='utf-8') as f:
-                        output_lines.append(f.read())
-                except Exception as e:
-                    output_lines.append(f"// ***** ERROR READING YY FILE: {relative_yy_path} *****")
-                    output_lines.append(f"// ***** Error: {e} *****")
-                    
-                output_lines.append("")
-                output_lines.append("=" * 30 + "[End YY]" + "=" * 32)
-                output_lines.append("")
-                
-                exported_yy_files.add(asset_yy_path)
-                
-        return "\n".join(output_lines)
-    
+            if yy_path:
+                yy_result = next(reads)
+                if isinstance(yy_result[1], (FileNotFoundError, IsADirectoryError, NotADirectoryError)):
+                    continue  # removed since the scan
+
+                relative_yy_path = self._normalize_path(os.path.relpath(yy_path, self.project_path))
+                asset_name = os.path.basename(os.path.dirname(yy_path))
+
+                yield (
+                    f"\n// ----- Associated YY File: {asset_name} -----\n"
+                    f"// ----- YY Path: {relative_yy_path} -----\n\n"
+                )
+                yield self._read_result_text(yy_result, "YY", relative_yy_path)
+                yield "\n\n" + "=" * 30 + "[End YY]" + "=" * 32 + "\n"
+
+    def _prefetch_files(self, paths: List[str]) -> Iterator[Tuple[Optional[str], Optional[Exception]]]:
+        """Reads files on a thread pool, yielding (text, error) in input order.
+
+        Up to _EXPORT_READ_WINDOW reads are queued ahead of the consumer, so memory
+        stays proportional to the window rather than to the whole project. Open file
+        handles are capped by the worker count; with max_workers <= 1 files are read inline.
+        """
+        if self.max_workers <= 1:
+            for path in paths:
+                yield _read_text(path, self._file_sizes.get(path))
+            return
+
+        path_iter = iter(paths)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            pending = deque(
+                executor.submit(_read_text, path, self._file_sizes.get(path))
+                for path in itertools.islice(path_iter, self._EXPORT_READ_WINDOW)
+            )
+            while pending:
+                result = pending.popleft().result()
+                next_path = next(path_iter, None)
+                if next_path is not None:
+                    pending.append(executor.submit(_read_text, next_path, self._file_sizes.get(next_path)))
+                yield result
+
+    @staticmethod
+    def _read_result_text(result: Tuple[Optional[str], Optional[Exception]],
+                          kind: str, relative_path: str) -> str:
+        """Returns prefetched file text, or an inline error marker if the read failed."""
+        content, error = result
+        if error is None:
+            return content
+        return (
+            f"// ***** ERROR READING {kind} FILE: {relative_path} *****\n"
+            f"// ***** Error: {error} *****"
+        )
+
     def _format_room_data(self, data: Dict[str, Any]) -> str:
         """Форматирует данные комнаты для отображения"""
         output_lines = []
@@ -535,18 +1035,9 @@ class GMS2ProjectParser:
                 
                 if instances:
                     output_lines.append(f"{inst_prefix} Instances ({len(instances)})")
-                    instance_counts = Counter()
-                    for inst in instances:
-                        instance_counts[inst.get('objId', {}).get('name', 'UnknownObject')] += 1
-                    
-                    sorted_objects = sorted(instance_counts.items())
-                    obj_prefix_connector = f"{inst_prefix_connector}    "
-                    
-                    for j, (obj_name, count) in enumerate(sorted_objects):
-                        is_last_obj = (j == len(sorted_objects) - 1)
-                        obj_prefix = f"{obj_prefix_connector}{'└──' if is_last_obj else '├──'}"
-                        count_str = f" (x{count})" if count > 1 else ""
-                        output_lines.append(f"{obj_prefix} {obj_name}{count_str}")
+                    output_lines.extend(
+                        _instance_count_lines(instances, f"{inst_prefix_connector}    ")
+                    )
         
         # Свойства комнаты
         room_settings = data.get('roomSettings', {})
@@ -6,10 +6,13 @@ Provides tools for parsing and analyzing GMS2 projects.
 
 import asyncio
 import argparse
+import functools
+import itertools
 import json
 import os
 import sys
-from typing import Any, Dict, List, Optional
+import weakref
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
 
 from mcp.server import Server
 from mcp.server.stdio import stdio_server
@@ -18,51 +21,156 @@ from dotenv import load_dotenv
 
 from gms2_parser import GMS2ProjectParser
 
+CONFIG_FILE = os.path.join(os.path.dirname(__file__), 'config.env')
+_ENV_CACHE = {"loaded": False}
+
+# Informational stderr output is opt-in; warnings and errors are always written
+DEBUG = bool(os.getenv('GMS2_MCP_DEBUG'))
+
+
+def _log(*lines: str):
+    """Writes diagnostic lines to stderr in one call when GMS2_MCP_DEBUG is set"""
+    if DEBUG:
+        sys.stderr.write("\n".join(lines) + "\n")
+        sys.stderr.flush()
+
+
+def _text(text: str) -> TextContent:
+    """Builds a text content block without re-running pydantic validation"""
+    return TextContent.model_construct(type="text", text=text)
+
+
+def needs_project_path(*required: str):
+    """Resolves the project path and checks required arguments before calling a tool handler.
+
+    The wrapped handler is called as handler(self, project_path, arguments).
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(self, arguments: Dict[str, Any]):
+            try:
+                project_path = self._get_project_path(arguments)
+            except ValueError as e:
+                return self._error(str(e))
+
+            for name in required:
+                if not arguments.get(name):
+                    return self._error(f"{name} is required")
+
+            return await func(self, project_path, arguments)
+        return wrapper
+    return decorator
+
+
+def _load_config_env():
+    """Loads config.env into the process environment at most once"""
+    if not _ENV_CACHE["loaded"]:
+        load_dotenv(CONFIG_FILE)
+        _ENV_CACHE["loaded"] = True
+
 
 class GMS2MCPServer:
     """MCP Server for GameMaker Studio 2"""
 
+    _SEP = "=" * 50
+    _DASH = "-" * 50
+
+    # Parsers (and their watchers) kept alive at once; the least recently used is stopped
+    _MAX_PARSERS = 8
+
     def __init__(self, project_path: Optional[str] = None):
         self.project_path = project_path
-        print(f"GMS2MCPServer initialized with project_path: {project_path}", file=sys.stderr)
+        self._parser_cache: Dict[str, GMS2ProjectParser] = {}
+        self._background_tasks: Set[asyncio.Task] = set()
+        # Weak keys: a lock lives exactly as long as someone still holds its parser
+        self._parser_locks: "weakref.WeakKeyDictionary[GMS2ProjectParser, asyncio.Lock]" = weakref.WeakKeyDictionary()
+        self._project_path_cache: Dict[Optional[str], str] = {}
+        self._tools = self._build_tools()
+        # The server never chdirs, so the working directory is resolved once
+        self._cwd_abs = os.path.abspath(os.getcwd())
+
+        # No-op when main() already loaded config.env
+        _load_config_env()
+        self._env_project_path = os.getenv('GMS2_PROJECT_PATH')
+
+        _log(f"GMS2MCPServer initialized with project_path: {project_path}")
 
     def _get_project_path(self, arguments: Dict[str, Any]) -> str:
         """Gets the correct project path from arguments or config.env"""
         provided_path = arguments.get("project_path")
 
+        resolved = self._project_path_cache.get(provided_path)
+        if resolved is None:
+            resolved = self._resolve_project_path(provided_path)
+            self._project_path_cache[provided_path] = resolved
+        return resolved
+
+    def _resolve_project_path(self, provided_path: Optional[str]) -> str:
+        """Resolves the project path for a given project_path argument (uncached)"""
         # Use provided path if it's a real project path (not the MCP server root)
         if provided_path:
-            current_dir = os.getcwd()
-            if os.path.abspath(provided_path) != os.path.abspath(current_dir):
-                return provided_path
+            provided_abs = os.path.abspath(provided_path)
+            if provided_abs != self._cwd_abs:
+                return provided_abs
 
         # Fall back to configured path
         if self.project_path:
             return self.project_path
 
-        # Last resort: try config.env
-        config_file = os.path.join(os.path.dirname(__file__), 'config.env')
-        print(f"Looking for config.env at: {config_file}", file=sys.stderr)
-        load_dotenv(config_file)
-        config_path = os.getenv('GMS2_PROJECT_PATH')
-        if config_path:
-            print(f"Loading project path from config.env: {config_path}", file=sys.stderr)
-            return config_path
+        # Last resort: GMS2_PROJECT_PATH from config.env
+        if self._env_project_path:
+            _log(f"Loading project path from config.env: {self._env_project_path}")
+            return self._env_project_path
 
         raise ValueError(
             "Project path not configured. Set GMS2_PROJECT_PATH in config.env "
             "or pass --project-path argument."
         )
 
+    def _get_parser(self, project_path: str) -> GMS2ProjectParser:
+        """Returns the cached parser for a project, creating it on first use"""
+        key = os.path.abspath(project_path)
+        parser = self._parser_cache.pop(key, None)
+        if parser is None:
+            parser = GMS2ProjectParser(project_path, watch=True)
+            self._parser_locks[parser] = asyncio.Lock()
+        # Re-inserted so the dict stays in least- to most-recently-used order
+        self._parser_cache[key] = parser
+
+        while len(self._parser_cache) > self._MAX_PARSERS:
+            evicted = self._parser_cache.pop(next(iter(self._parser_cache)))
+            # Stopped in the background so this call doesn't queue behind the evicted
+            # parser's in-flight work (e.g. a long export)
+            task = asyncio.create_task(self._run(evicted, evicted.stop_watching))
+            self._background_tasks.add(task)
+            task.add_done_callback(self._background_tasks.discard)
+        return parser
+
+    async def _run(self, parser: GMS2ProjectParser, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Runs blocking parser work in a worker thread, one call per parser at a time"""
+        # Waiting happens on the event loop, so queued calls don't occupy executor threads
+        async with self._parser_locks[parser]:
+            work = asyncio.ensure_future(asyncio.to_thread(func, *args, **kwargs))
+            try:
+                return await asyncio.shield(work)
+            except asyncio.CancelledError:
+                # The thread can't be interrupted; keep the lock until it has finished
+                await asyncio.wait({work})
+                raise
+
     def _error(self, message: str) -> CallToolResult:
         """Returns an MCP error result with isError=True"""
         return CallToolResult(
-            content=[TextContent(type="text", text=f"Error: {message}")],
+            content=[_text(f"Error: {message}")],
             isError=True,
         )
 
     def get_tools(self) -> List[Tool]:
         """Returns the list of available tools"""
+        return self._tools
+
+    def _build_tools(self) -> List[Tool]:
+        """Builds the static tool list (called once from __init__)"""
         return [
             Tool(
                 name="scan_gms2_project",
@@ -301,40 +409,18 @@ class GMS2MCPServer:
     async def handle_tool_call(self, name: str, arguments: Dict[str, Any]):
         """Handles tool calls"""
         try:
-            if name == "scan_gms2_project":
-                return await self._scan_project(arguments)
-            elif name == "get_gml_file_content":
-                return await self._get_gml_content(arguments)
-            elif name == "get_room_info":
-                return await self._get_room_info(arguments)
-            elif name == "get_object_info":
-                return await self._get_object_info(arguments)
-            elif name == "get_sprite_info":
-                return await self._get_sprite_info(arguments)
-            elif name == "export_project_data":
-                return await self._export_project_data(arguments)
-            elif name == "list_project_assets":
-                return await self._list_project_assets(arguments)
-            elif name == "duplicate_object":
-                return await self._duplicate_object(arguments)
-            elif name == "add_room_instance":
-                return await self._add_room_instance(arguments)
-            elif name == "write_gml_file":
-                return await self._write_gml_file(arguments)
-            else:
+            handler = self._HANDLERS.get(name)
+            if handler is None:
                 return self._error(f"Unknown tool: {name}")
+            return await handler(self, arguments)
         except Exception as e:
             return self._error(f"Error executing tool {name}: {str(e)}")
 
-    async def _scan_project(self, arguments: Dict[str, Any]):
+    @needs_project_path()
+    async def _scan_project(self, project_path: str, arguments: Dict[str, Any]):
         """Scans a GMS2 project"""
-        try:
-            project_path = self._get_project_path(arguments)
-        except ValueError as e:
-            return self._error(str(e))
-
-        parser = GMS2ProjectParser(project_path)
-        result = parser.scan_project()
+        parser = self._get_parser(project_path)
+        result = await self._run(parser, parser.scan_project)
 
         if "error" in result:
             return self._error(result['error'])
@@ -348,38 +434,34 @@ class GMS2MCPServer:
         for category, info in result['categories'].items():
             if info['assets']:
                 output.append(f"{category}: {len(info['assets'])} assets")
-                for asset in info['assets']:
-                    gml_count = len(asset['gml_files'])
-                    yy_status = "+" if asset['yy_file'] else "-"
-                    output.append(f"  - {asset['name']} (GML: {gml_count}, YY: {yy_status})")
+                output.extend(
+                    f"  - {asset['name']} (GML: {len(asset['gml_files'])}, YY: {'+' if asset['yy_file'] else '-'})"
+                    for asset in info['assets']
+                )
 
         output.append("")
         output.append("Recent GML Files:")
-        for i, (display_name, _, relative_path, _) in enumerate(result['gml_files'][:10]):
-            output.append(f"  {i+1}. {display_name} ({relative_path})")
+        output.extend(
+            f"  {i}. {details[0]} ({details[2]})"
+            for i, details in enumerate(itertools.islice(result['gml_files'], 10), 1)
+        )
 
         if len(result['gml_files']) > 10:
             output.append(f"  ... and {len(result['gml_files']) - 10} more files")
 
-        return [TextContent(type="text", text="\n".join(output))]
+        return [_text("\n".join(output))]
 
-    async def _get_gml_content(self, arguments: Dict[str, Any]):
+    @needs_project_path("file_path")
+    async def _get_gml_content(self, project_path: str, arguments: Dict[str, Any]):
         """Gets the content of a GML file"""
-        try:
-            project_path = self._get_project_path(arguments)
-        except ValueError as e:
-            return self._error(str(e))
+        file_path = arguments["file_path"]
 
-        file_path = arguments.get("file_path")
-        if not file_path:
-            return self._error("file_path is required")
-
-        parser = GMS2ProjectParser(project_path)
+        parser = self._get_parser(project_path)
 
         if not os.path.isabs(file_path):
             file_path = os.path.join(project_path, file_path)
 
-        result = parser.get_gml_content(file_path)
+        result = await self._run(parser, parser.get_gml_content, file_path)
 
         if "error" in result:
             return self._error(result['error'])
@@ -387,31 +469,24 @@ class GMS2MCPServer:
         output = []
         output.append(f"GML File: {result['relative_path']}")
         output.append(f"Lines: {result['line_count']}")
-        output.append("-" * 50)
+        output.append(self._DASH)
         output.append(result['content'])
 
-        return [TextContent(type="text", text="\n".join(output))]
+        return [_text("\n".join(output))]
 
-    async def _get_room_info(self, arguments: Dict[str, Any]):
+    @needs_project_path("room_name")
+    async def _get_room_info(self, project_path: str, arguments: Dict[str, Any]):
         """Gets room information"""
-        try:
-            project_path = self._get_project_path(arguments)
-        except ValueError as e:
-            return self._error(str(e))
-
-        room_name = arguments.get("room_name")
-        if not room_name:
-            return self._error("room_name is required")
-
-        parser = GMS2ProjectParser(project_path)
-        result = parser.get_room_info(room_name)
+        room_name = arguments["room_name"]
+        parser = self._get_parser(project_path)
+        result = await self._run(parser, parser.get_room_info, room_name)
 
         if "error" in result:
             return self._error(result['error'])
 
         output = []
         output.append(f"Room Information: {result['room_name']}")
-        output.append("=" * 50)
+        output.append(self._SEP)
         output.append("")
         output.append("Formatted View:")
         output.append(result['formatted_info'])
@@ -421,28 +496,21 @@ class GMS2MCPServer:
         output.append(f"- Layers: {len(result['data'].get('layers', []))}")
         output.append(f"- Room Settings: {'Yes' if result['data'].get('roomSettings') else 'No'}")
 
-        return [TextContent(type="text", text="\n".join(output))]
+        return [_text("\n".join(output))]
 
-    async def _get_object_info(self, arguments: Dict[str, Any]):
+    @needs_project_path("object_name")
+    async def _get_object_info(self, project_path: str, arguments: Dict[str, Any]):
         """Gets object information"""
-        try:
-            project_path = self._get_project_path(arguments)
-        except ValueError as e:
-            return self._error(str(e))
-
-        object_name = arguments.get("object_name")
-        if not object_name:
-            return self._error("object_name is required")
-
-        parser = GMS2ProjectParser(project_path)
-        result = parser.get_object_info(object_name)
+        object_name = arguments["object_name"]
+        parser = self._get_parser(project_path)
+        result = await self._run(parser, parser.get_object_info, object_name)
 
         if "error" in result:
             return self._error(result['error'])
 
         output = []
         output.append(f"Object Information: {result['object_name']}")
-        output.append("=" * 50)
+        output.append(self._SEP)
         output.append("")
         output.append("Formatted View:")
         output.append(result['formatted_info'])
@@ -452,28 +520,21 @@ class GMS2MCPServer:
         output.append(f"- Events: {len(result['data'].get('eventList', []))}")
         output.append(f"- Physics: {'Enabled' if result['data'].get('physicsObject') else 'Disabled'}")
 
-        return [TextContent(type="text", text="\n".join(output))]
+        return [_text("\n".join(output))]
 
-    async def _get_sprite_info(self, arguments: Dict[str, Any]):
+    @needs_project_path("sprite_name")
+    async def _get_sprite_info(self, project_path: str, arguments: Dict[str, Any]):
         """Gets sprite information"""
-        try:
-            project_path = self._get_project_path(arguments)
-        except ValueError as e:
-            return self._error(str(e))
-
-        sprite_name = arguments.get("sprite_name")
-        if not sprite_name:
-            return self._error("sprite_name is required")
-
-        parser = GMS2ProjectParser(project_path)
-        result = parser.get_sprite_info(sprite_name)
+        sprite_name = arguments["sprite_name"]
+        parser = self._get_parser(project_path)
+        result = await self._run(parser, parser.get_sprite_info, sprite_name)
 
         if "error" in result:
             return self._error(result['error'])
 
         output = []
         output.append(f"Sprite Information: {result['sprite_name']}")
-        output.append("=" * 50)
+        output.append(self._SEP)
         output.append("")
         output.append(f"Sprite Path: {result['sprite_path']}")
         output.append(f"YY File: {'Yes' if result['yy_path'] else 'No'}")
@@ -485,20 +546,15 @@ class GMS2MCPServer:
             for i, frame in enumerate(result['frames']):
                 output.append(f"  {i+1}. {frame['filename']}")
 
-        return [TextContent(type="text", text="\n".join(output))]
+        return [_text("\n".join(output))]
 
-    async def _export_project_data(self, arguments: Dict[str, Any]):
+    @needs_project_path()
+    async def _export_project_data(self, project_path: str, arguments: Dict[str, Any]):
         """Exports all project data"""
-        try:
-            project_path = self._get_project_path(arguments)
-        except ValueError as e:
-            return self._error(str(e))
-
         save_to_file = arguments.get("save_to_file", False)
         output_file = arguments.get("output_file")
 
-        parser = GMS2ProjectParser(project_path)
-        export_data = parser.export_all_data()
+        parser = self._get_parser(project_path)
 
         if save_to_file:
             if not output_file:
@@ -506,33 +562,29 @@ class GMS2MCPServer:
                 output_file = f"{project_name}_export.txt"
 
             try:
-                with open(output_file, 'w', encoding='utf-8') as f:
-                    f.write(export_data)
+                written = await self._run(parser, self._write_export, parser, output_file)
 
-                return [TextContent(type="text", text=f"Project data exported to: {output_file}\n\nFile size: {len(export_data)} characters")]
+                return [_text(f"Project data exported to: {output_file}\n\nFile size: {written} characters")]
             except Exception as e:
                 return self._error(f"Error saving file: {str(e)}")
         else:
-            return [TextContent(type="text", text=export_data)]
+            return [_text(await self._run(parser, parser.export_all_data))]
 
-    async def _duplicate_object(self, arguments: Dict[str, Any]):
-        """Duplicates a GMS2 object"""
-        try:
-            project_path = self._get_project_path(arguments)
-        except ValueError as e:
-            return self._error(str(e))
+    @staticmethod
+    def _write_export(parser: GMS2ProjectParser, output_file: str) -> int:
+        """Streams the export straight to disk instead of building it in memory"""
+        with open(output_file, 'w', encoding='utf-8') as f:
+            return parser.export_all_data_to(f)
 
-        source = arguments.get("source_object")
-        new_name = arguments.get("new_object_name")
+    @needs_project_path("source_object", "new_object_name")
+    async def _duplicate_object(self, project_path: str, arguments: Dict[str, Any]):
+        """Duplicates a GMS2 object"""
+        source = arguments["source_object"]
+        new_name = arguments["new_object_name"]
         overrides = arguments.get("property_overrides")
 
-        if not source:
-            return self._error("source_object is required")
-        if not new_name:
-            return self._error("new_object_name is required")
-
-        parser = GMS2ProjectParser(project_path)
-        result = parser.duplicate_object(source, new_name, overrides)
+        parser = self._get_parser(project_path)
+        result = await self._run(parser, parser.duplicate_object, source, new_name, overrides)
 
         if "error" in result:
             return self._error(result['error'])
@@ -548,29 +600,23 @@ class GMS2MCPServer:
             for k, v in result['property_overrides'].items():
                 output.append(f"  {k} = {v}")
 
-        return [TextContent(type="text", text="\n".join(output))]
+        return [_text("\n".join(output))]
 
-    async def _add_room_instance(self, arguments: Dict[str, Any]):
+    @needs_project_path("room_name", "object_name")
+    async def _add_room_instance(self, project_path: str, arguments: Dict[str, Any]):
         """Adds an instance to a room"""
-        try:
-            project_path = self._get_project_path(arguments)
-        except ValueError as e:
-            return self._error(str(e))
-
-        room_name = arguments.get("room_name")
-        object_name = arguments.get("object_name")
+        room_name = arguments["room_name"]
+        object_name = arguments["object_name"]
         x = arguments.get("x")
         y = arguments.get("y")
 
-        if not room_name:
-            return self._error("room_name is required")
-        if not object_name:
-            return self._error("object_name is required")
         if x is None or y is None:
             return self._error("x and y are required")
 
-        parser = GMS2ProjectParser(project_path)
-        result = parser.add_room_instance(
+        parser = self._get_parser(project_path)
+        result = await self._run(
+            parser,
+            parser.add_room_instance,
             room_name=room_name,
             object_name=object_name,
             x=float(x),
@@ -599,24 +645,18 @@ class GMS2MCPServer:
             for k, v in result['property_overrides'].items():
                 output.append(f"  {k} = {v}")
 
-        return [TextContent(type="text", text="\n".join(output))]
+        return [_text("\n".join(output))]
 
-    async def _write_gml_file(self, arguments: Dict[str, Any]):
+    @needs_project_path("file_path")
+    async def _write_gml_file(self, project_path: str, arguments: Dict[str, Any]):
         """Writes content to a GML file"""
-        try:
-            project_path = self._get_project_path(arguments)
-        except ValueError as e:
-            return self._error(str(e))
-
-        file_path = arguments.get("file_path")
+        file_path = arguments["file_path"]
         content = arguments.get("content")
-        if not file_path:
-            return self._error("file_path is required")
         if content is None:
             return self._error("content is required")
 
-        parser = GMS2ProjectParser(project_path)
-        result = parser.write_gml_file(file_path, content)
+        parser = self._get_parser(project_path)
+        result = await self._run(parser, parser.write_gml_file, file_path, content)
 
         if "error" in result:
             return self._error(result['error'])
@@ -626,50 +666,64 @@ class GMS2MCPServer:
         output.append(f"Lines: {result['line_count']}")
         output.append(f"Size: {result['char_count']} characters")
 
-        return [TextContent(type="text", text="\n".join(output))]
+        return [_text("\n".join(output))]
 
-    async def _list_project_assets(self, arguments: Dict[str, Any]):
+    @needs_project_path()
+    async def _list_project_assets(self, project_path: str, arguments: Dict[str, Any]):
         """Lists project assets"""
-        try:
-            project_path = self._get_project_path(arguments)
-        except ValueError as e:
-            return self._error(str(e))
-
         category_filter = arguments.get("category")
 
-        parser = GMS2ProjectParser(project_path)
-        result = parser.scan_project()
+        parser = self._get_parser(project_path)
+        # A filtered listing only needs its own category folder walked
+        if category_filter:
+            result = await self._run(parser, parser.scan_category, category_filter)
+        else:
+            result = await self._run(parser, parser.scan_project)
 
         if "error" in result:
             return self._error(result['error'])
 
         output = []
         output.append(f"Assets in {result['project_name']}:")
-        output.append("=" * 50)
+        output.append(self._SEP)
 
-        categories_to_show = [category_filter] if category_filter else result['categories'].keys()
+        categories = result['categories']
+        categories_to_show = [category_filter] if category_filter else categories.keys()
 
         for category in categories_to_show:
-            if category in result['categories']:
-                info = result['categories'][category]
-                if info['assets']:
-                    output.append(f"\n{category} ({len(info['assets'])} items):")
-                    for asset in info['assets']:
-                        gml_files = len(asset['gml_files'])
-                        yy_file = "+" if asset['yy_file'] else "-"
-                        output.append(f"  - {asset['name']} (GML: {gml_files}, YY: {yy_file})")
-
-                        if gml_files > 0 and gml_files <= 5:
-                            for gml in asset['gml_files']:
-                                output.append(f"    * {gml['name']}")
-
-        return [TextContent(type="text", text="\n".join(output))]
+            info = categories.get(category)
+            if not info or not info['assets']:
+                continue
+
+            output.append(f"\n{category} ({len(info['assets'])} items):")
+            for asset in info['assets']:
+                gml_files = len(asset['gml_files'])
+                yy_file = "+" if asset['yy_file'] else "-"
+                output.append(f"  - {asset['name']} (GML: {gml_files}, YY: {yy_file})")
+
+                if 0 < gml_files <= 5:
+                    output.extend(f"    * {gml['name']}" for gml in asset['gml_files'])
+
+        return [_text("\n".join(output))]
+
+    # Tool name -> handler, looked up once per call instead of an if/elif chain
+    _HANDLERS: Dict[str, Callable[["GMS2MCPServer", Dict[str, Any]], Awaitable[Any]]] = {
+        "scan_gms2_project": _scan_project,
+        "get_gml_file_content": _get_gml_content,
+        "get_room_info": _get_room_info,
+        "get_object_info": _get_object_info,
+        "get_sprite_info": _get_sprite_info,
+        "export_project_data": _export_project_data,
+        "list_project_assets": _list_project_assets,
+        "duplicate_object": _duplicate_object,
+        "add_room_instance": _add_room_instance,
+        "write_gml_file": _write_gml_file,
+    }
 
 
 async def main():
     """Main server entry point"""
-    config_file = os.path.join(os.path.dirname(__file__), 'config.env')
-    load_dotenv(config_file)
+    _load_config_env()
 
     parser = argparse.ArgumentParser(description="GameMaker Studio 2 MCP Server")
     parser.add_argument("--project-path", type=str, help="Path to GMS2 project (overrides config.env)")
@@ -683,7 +737,7 @@ async def main():
     mcp_server = GMS2MCPServer(project_path)
 
     if project_path:
-        print(f"MCP Server initialized with project path: {project_path}", file=sys.stderr)
+        _log(f"MCP Server initialized with project path: {project_path}")
 
     server = Server("gms2-mcp-server")
 
@@ -701,7 +755,7 @@ async def main():
 
 if __name__ == "__main__":
     try:
-        print("Starting MCP server...", file=sys.stderr)
+        _log("Starting MCP server...")
         asyncio.run(main())
     except Exception as e:
         print(f"Error starting MCP server: {e}", file=sys.stderr)
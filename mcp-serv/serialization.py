@@ -0,0 +1,35 @@
+"""
+JSON serialization helpers
+Uses orjson when it is installed and falls back to the standard json module
+"""
+
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+HAS_ORJSON = orjson is not None
+
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so this catches both
+JSONDecodeError = json.JSONDecodeError
+
+
+if HAS_ORJSON:
+    def loads(data: Union[bytes, str]) -> Any:
+        """Parses JSON from bytes or str."""
+        return orjson.loads(data)
+
+    def dumps(obj: Any) -> str:
+        """Serializes a single value (e.g. one .yy key or scalar) to compact JSON text."""
+        return orjson.dumps(obj).decode('utf-8')
+else:
+    def loads(data: Union[bytes, str]) -> Any:
+        """Parses JSON from bytes or str."""
+        return json.loads(data)
+
+    def dumps(obj: Any) -> str:
+        """Serializes a single value (e.g. one .yy key or scalar) to compact JSON text."""
+        return json.dumps(obj, ensure_ascii=False, separators=(',', ':'))